@@ -11,7 +11,9 @@ from api.store import (
     Source,
     SourceMedia,
     SourceMinimal,
+    get_column_values,
     get_data,
+    get_name_index,
 )
 from api.substack import SubstackPost, substack_search
 from api.x import Tweet, x_search
@@ -39,13 +41,8 @@ def search_media(
     _: Annotated[None, Depends(verify_apikey)],
 ) -> list[Source]:
     """Search the curated independent media sources database for a partial name."""
-    data = get_data()
-    results = []
-    for name in names.split(","):
-        for item in data:
-            if name == item["Name"]:
-                results.append(Source(**item))
-    return results
+    index = get_name_index()
+    return [Source(**item) for name in names.split(",") for item in index.get(name, [])]
 
 
 @app.get("/sources")
@@ -107,27 +104,6 @@ def get_source_media(
     return selected_sources
 
 
-def get_column_values(
-    name: Annotated[
-        str | None,
-        Query(
-            title="Name of column",
-            min_length=3,
-            examples=["Youtube"],
-        ),
-    ] = None,
-    _: None = Depends(verify_apikey),
-) -> list[str]:
-    """Returns a list of sources' Youtube channel and X handles. Used as input for AI to query for videos and tweets."""
-    data = get_data()
-    values = []
-    for _i, item in enumerate(data):
-        for key, value in item.items():
-            if key.lower() == name.lower():
-                values.append(value)
-    return values
-
-
 @app.get("/source-names")
 def get_source_names(
     _: Annotated[None, Depends(verify_apikey)],
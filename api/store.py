@@ -1,6 +1,11 @@
-import pandas as pd
+import csv
+import os
+from functools import lru_cache
+
 from pydantic import BaseModel
 
+CSV_PATH = "data/sources.csv"
+
 
 class SourceMedia(BaseModel):
     """Source minimal model."""
@@ -36,7 +41,86 @@ class SourceMinimal(BaseModel):
     Topics: str
 
 
+def _csv_version() -> tuple[str, int]:
+    """Returns the CSV path and its mtime, which together key the parsed data."""
+    return CSV_PATH, os.stat(CSV_PATH).st_mtime_ns
+
+
+@lru_cache(maxsize=4)
+def _read_data(path: str, _mtime_ns: int) -> list[dict[str, str]]:
+    # every column is text, so the stdlib reader is all we need
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
 def get_data(force: bool = False) -> list[dict[str, str]]:
-    csv_file = "data/sources.csv"
-    df = pd.read_csv(csv_file, na_filter=False)
-    return df.to_dict(orient="records")
+    """Returns the sources, only parsing the CSV again when it changed on disk.
+
+    The returned list is shared between callers, so don't mutate it.
+    """
+    if force:
+        _read_data.cache_clear()
+        _name_index.cache_clear()
+        _youtube_index.cache_clear()
+        _x_index.cache_clear()
+    return _read_data(*_csv_version())
+
+
+@lru_cache(maxsize=4)
+def _name_index(path: str, mtime_ns: int) -> dict[str, list[dict[str, str]]]:
+    index: dict[str, list[dict[str, str]]] = {}
+    for item in _read_data(path, mtime_ns):
+        index.setdefault(item["Name"], []).append(item)
+    return index
+
+
+def get_name_index() -> dict[str, list[dict[str, str]]]:
+    """Returns our sources keyed by their exact name."""
+    return _name_index(*_csv_version())
+
+
+@lru_cache(maxsize=1024)
+def canonical_handle(handle: str) -> str:
+    """Normalize a Youtube handle or channel url to a bare lowercase handle."""
+    handle = handle.strip().lower()
+    for prefix in ("https://", "http://", "www.", "m.", "youtube.com/"):
+        handle = handle.removeprefix(prefix)
+    return handle.strip("/").lstrip("@")
+
+
+@lru_cache(maxsize=4)
+def _youtube_index(path: str, mtime_ns: int) -> dict[str, str]:
+    return {
+        canonical_handle(item["Youtube"]): item["Youtube"]
+        for item in _read_data(path, mtime_ns)
+        if item["Youtube"] != "n/a"
+    }
+
+
+def get_youtube_index() -> dict[str, str]:
+    """Returns our sources' Youtube handles keyed by their canonical handle."""
+    return _youtube_index(*_csv_version())
+
+
+@lru_cache(maxsize=4)
+def _x_index(path: str, mtime_ns: int) -> dict[str, str]:
+    index: dict[str, str] = {}
+    for item in _read_data(path, mtime_ns):
+        if item["X"] and item["X"].lower() != "n/a":
+            index.setdefault(item["X"].lower(), item["X"])
+    return index
+
+
+def get_x_index() -> dict[str, str]:
+    """Returns our sources' X handles keyed by their lowercased handle."""
+    return _x_index(*_csv_version())
+
+
+def get_column_values(name: str) -> list[str]:
+    """Returns the sources' values for a column, matching its name case insensitively."""
+    values = []
+    for item in get_data():
+        for key, value in item.items():
+            if key.lower() == name.lower():
+                values.append(value)
+    return values
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 from html import unescape
@@ -7,7 +8,8 @@ from bs4 import BeautifulSoup
 from pydantic import BaseModel
 from substack_api import Newsletter
 
-from lib.cache import sync_threadsafe_ttl_cache as cache
+from lib.cache import async_threadsafe_ttl_cache
+from lib.utils import bounded_gather
 
 logger = logging.getLogger(__name__)
 
@@ -96,46 +98,63 @@ def _process_substack_post(post: Any, pub_name: str) -> SubstackPost | None:
     )
 
 
-@cache(ttl=86400)
+def _search_publication(
+    pub: str, query: str | None, max_posts_per_publication: int
+) -> list[SubstackPost]:
+    """Fetch and process the posts of a single publication."""
+    results = []
+    try:
+        newsletter_url = f"https://{pub}.substack.com"
+        posts = _fetch_newsletter_posts(
+            newsletter_url, query, max_posts_per_publication
+        )
+        logger.debug(f"Got {len(posts)} posts from {pub}")
+
+        for post in posts:
+            try:
+                substack_post = _process_substack_post(post, pub)
+                if substack_post:
+                    results.append(substack_post)
+            except (AttributeError, KeyError, ValueError, TypeError) as e:
+                logger.exception(f"Error processing post {post.url}: {e}")
+                continue
+
+    except (
+        ConnectionError,
+        TimeoutError,
+        ValueError,
+        AttributeError,
+        KeyError,
+    ) as e:
+        logger.exception(f"Error fetching posts from {pub}: {e}")
+    return results
+
+
+@async_threadsafe_ttl_cache(ttl=86400)
 async def substack_search(
     publications: str | None = None,
     query: str | None = None,
     max_posts_per_publication: int = 10,
     get_content: bool = True,
+    concurrency: int = 10,
 ) -> list[SubstackPost]:
     """Search for posts from Substack publications."""
     logger.debug(
         f"substack_search called with: publications={publications}, max_posts={max_posts_per_publication}"
     )
-    results = []
     publication_list = publications.split(",") if publications else []
 
-    for pub in publication_list:
-        try:
-            newsletter_url = f"https://{pub.strip()}.substack.com"
-            posts = _fetch_newsletter_posts(
-                newsletter_url, query, max_posts_per_publication
+    # substack_api is blocking, so each publication is fetched in a worker thread
+    per_publication = await bounded_gather(
+        (
+            asyncio.to_thread(
+                _search_publication, pub.strip(), query, max_posts_per_publication
             )
-            logger.debug(f"Got {len(posts)} posts from {pub}")
-
-            for post in posts:
-                try:
-                    substack_post = _process_substack_post(post, pub.strip())
-                    if substack_post:
-                        results.append(substack_post)
-                except (AttributeError, KeyError, ValueError, TypeError) as e:
-                    logger.exception(f"Error processing post {post.url}: {e}")
-                    continue
-
-        except (
-            ConnectionError,
-            TimeoutError,
-            ValueError,
-            AttributeError,
-            KeyError,
-        ) as e:
-            logger.exception(f"Error fetching posts from {pub}: {e}")
-            continue
+            for pub in publication_list
+        ),
+        concurrency,
+    )
+    results = [post for posts in per_publication for post in posts]
 
     logger.debug(f"Returning {len(results)} total posts")
     return results
@@ -1,17 +1,18 @@
 import asyncio
 import logging
 import os
+from collections import Counter
 from datetime import datetime
 from http.cookies import SimpleCookie
 
 import dotenv
-from fastapi import HTTPException
 from pydantic import BaseModel
+from starlette.exceptions import HTTPException
 from twikit import Client
 from twikit import Tweet as TwikitTweet
 from twikit import User as TwikitUser
 
-from api.store import get_data
+from api.store import get_x_index
 from lib.cache import async_threadsafe_ttl_cache
 from lib.utils import get_since_date
 
@@ -31,6 +32,9 @@ if not os.path.exists(cookies_file):
     with open(cookies_file, "w", encoding="utf-8") as f:
         f.write(cookies_raw)
 
+# paging pause between search requests, a seam so tests don't have to patch asyncio
+_sleep = asyncio.sleep
+
 client = Client(
     user_agent=(
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -77,7 +81,7 @@ def _validate_x_search_params(
         users = None
     if not users and not query:
         raise ValueError("Either users or query must be provided")
-    if period_days <= 1:
+    if period_days < 1:
         raise ValueError("period_days must be 1 or more")
     if end_date:
         try:
@@ -94,8 +98,7 @@ def _build_x_search_query(
 ) -> str:
     """Build the X search query string."""
     query_str = f" {query}" if query else ""
-    [year, month, day] = get_since_date(period_days, end_date)
-    since = f"since:{year}-{month}-{day} "
+    since = f"since:{get_since_date(period_days, end_date).isoformat()} "
     until = f"until:{end_date}" if end_date else ""
     users_str = " (" + " OR ".join(users_arr) + ")" if len(users_arr) > 0 else ""
     return f"{since}{until}{users_str}{query_str}".strip()
@@ -110,7 +113,7 @@ async def _fetch_tweets(search: str, count: int) -> list[Tweet]:
     while (len(_tweets) == 20) and len(tweets) < count:
         _tweets = await _tweets.next()
         tweets.extend(_tweets)
-        await asyncio.sleep(1)
+        await _sleep(1)
     return tweets
 
 
@@ -153,27 +156,26 @@ async def x_search(
 
 
 def _max_per_user(tweets: list[Tweet], max_tweets_per_user: int = 10) -> list[Tweet]:
-    ret: dict[int, list[Tweet]] = {}
+    counts: Counter[int] = Counter()
+    ret: list[Tweet] = []
     for tweet in tweets:
-        if tweet.user.id not in ret:
-            ret[tweet.user.id] = []
-        if len(ret[tweet.user.id]) >= max_tweets_per_user:
+        if counts[tweet.user.id] >= max_tweets_per_user:
             continue
-        ret[tweet.user.id].append(tweet)
-    # flatten the dict
-    return [tweet for tweets in ret.values() for tweet in tweets]
+        counts[tweet.user.id] += 1
+        ret.append(tweet)
+    return ret
 
 
 def _filter_users(users: list[str]) -> list[str]:
     """Only allow users in our data store."""
-    data = get_data()
+    index = get_x_index()
     fixed_users = []
     for user in users:
-        # look up as partial match in our db
-        found = next(
-            (item for item in data if user.lower() in str(item.get("X", "")).lower()),
-            None,
+        # look up as exact match first, then as partial match in our db
+        user_lower = user.lower()
+        found = index.get(user_lower) or next(
+            (handle for lower, handle in index.items() if user_lower in lower), None
         )
-        if found and found["X"] and found["X"].lower() != "n/a":
-            fixed_users.append(found["X"])
+        if found:
+            fixed_users.append(found)
     return fixed_users
@@ -1,26 +1,47 @@
 import asyncio
 import json
 import logging
+import re
 import time
 import urllib.parse
-from collections.abc import Coroutine
+from collections.abc import AsyncIterator, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any
 
-import dateparser
+import orjson
 from aiohttp import ClientSession
-from fastapi import HTTPException
+from cachetools import TTLCache
+from dateutil.relativedelta import relativedelta
 from munch import munchify
 from pydantic import BaseModel
+from starlette.exceptions import HTTPException
 from youtube_transcript_api import YouTubeTranscriptApi
 
-from api.store import get_data
+from api.store import canonical_handle, get_youtube_index
 from lib.cache import async_threadsafe_ttl_cache
 from lib.cache import sync_threadsafe_ttl_cache as cache
-from lib.utils import get_since_date
+from lib.utils import bounded_as_completed, bounded_gather, get_since_date
 
 logger = logging.getLogger(__name__)
 
+# anchors on the assignment (`var ytInitialData = {` or `window["ytInitialData"] = {`)
+_YT_INITIAL_DATA_RE = re.compile(r"ytInitialData\W*=\s*")
+_json_decoder = json.JSONDecoder()
+
+# Youtube's relative publish times, like "3 days ago" or "Streamed 1 month ago"
+_RELATIVE_TIME_RE = re.compile(
+    r"(?:Streamed )?(\d+) (second|minute|hour|day|week|month|year)s? ago"
+)
+
+# the transcript api is a blocking client, so we fan out fetches over threads
+_transcript_executor = ThreadPoolExecutor(thread_name_prefix="yt-transcripts")
+
+# url -> (etag, html) of channel search pages, so we can revalidate with If-None-Match
+# once the hourly _get_channel_videos cache expires; kept 2 hours after last use
+_etag_cache: TTLCache[str, tuple[str, str]] = TTLCache(maxsize=32, ttl=7200)
+
 
 class Transcript(BaseModel):
     """Transcript model."""
@@ -49,24 +70,35 @@ class Video(BaseModel):
     views: str
     publish_time: str
     url_suffix: str
+    # Full url of the video, so consumers don't have to build it from url_suffix.
+    url: str | None = None
     long_desc: str | None = None
     transcript: str | None = None
 
 
+def _extract_initial_data(html: str) -> dict[str, Any] | None:
+    """Extract the ytInitialData object embedded in a Youtube page.
+
+    The regex only locates the assignment, the decoder then stops right where the
+    object ends, so we never have to search for a terminator ourselves.
+    """
+    match = _YT_INITIAL_DATA_RE.search(html)
+    if not match:
+        return None
+    data, _ = _json_decoder.raw_decode(html, match.end())
+    return data
+
+
 def _parse_html_list(html: str, max_results: int) -> list[Video]:
     results: list[Video] = []
-    if "ytInitialData" not in html:
+    max_results = int(max_results)
+    data = _extract_initial_data(html)
+    if data is None:
         return []
-    start = html.index("ytInitialData") + len("ytInitialData") + 3
-    end = html.index("};", start) + 1
-    json_str = html[start:end]
-    data = json.loads(json_str)
     if "twoColumnBrowseResultsRenderer" not in data["contents"]:
         return []
-    tab = None
-    for tab in data["contents"]["twoColumnBrowseResultsRenderer"]["tabs"]:
-        if "expandableTabRenderer" in tab:
-            break
+    tabs = data["contents"]["twoColumnBrowseResultsRenderer"]["tabs"]
+    tab = next((tab for tab in tabs if "expandableTabRenderer" in tab), None)
     if tab is None:
         return []
     for contents in tab["expandableTabRenderer"]["content"]["sectionListRenderer"][
@@ -109,10 +141,12 @@ def _parse_html_list(html: str, max_results: int) -> list[Video]:
                     .get("webCommandMetadata", {})
                     .get("url", "")
                 )
+                if res["url_suffix"]:
+                    res["url"] = f"https://www.youtube.com{res['url_suffix']}"
                 results.append(Video(**res))
-                if len(results) >= int(max_results):
+                if len(results) >= max_results:
                     break
-        if len(results) >= int(max_results):
+        if len(results) >= max_results:
             break
 
     return results
@@ -120,10 +154,10 @@ def _parse_html_list(html: str, max_results: int) -> list[Video]:
 
 def _parse_html_video(html: str) -> dict[str, str]:
     result: dict[str, str] = {"long_desc": None}
-    start = html.index("ytInitialData") + len("ytInitialData") + 3
-    end = html.index("};", start) + 1
-    json_str = html[start:end]
-    data = json.loads(json_str)
+    data = _extract_initial_data(html)
+    if data is None:
+        logger.warning("No ytInitialData found, could not extract long description")
+        return result
     obj = munchify(data)
     try:
         result["long_desc"] = (
@@ -142,13 +176,26 @@ def _build_youtube_search_url(
     query: str | None, period_days: int, end_date: str
 ) -> str:
     """Build YouTube search query URL."""
-    [year, month, day] = get_since_date(period_days, end_date)
-    query_str = f"{query} " if query else ""
-    before = f"{' ' if query else ''}before:{end_date} " if end_date else ""
-    return urllib.parse.quote_plus(f"{query_str}{before}after:{year}-{month}-{day}")
-
-
-def _create_channel_tasks(
+    since = get_since_date(period_days, end_date)
+    parts = [query, f"before:{end_date}" if end_date else None]
+    parts.append(f"after:{since.isoformat()}")
+    return urllib.parse.quote_plus(" ".join(part for part in parts if part))
+
+
+@asynccontextmanager
+async def _shared_session(
+    session: ClientSession | None,
+) -> AsyncIterator[ClientSession]:
+    """Use the caller's session, or open one that all requests of a search share."""
+    if session is not None:
+        yield session
+        return
+    async with ClientSession() as new_session:
+        yield new_session
+
+
+def _create_channel_tasks(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    session: ClientSession,
     channels_arr: list[str],
     encoded_search: str,
     max_videos_per_channel: int,
@@ -163,6 +210,7 @@ def _create_channel_tasks(
         url = f"https://www.youtube.com/{channel}/search?hl=en&query={encoded_search}"
         tasks.append(
             _get_channel_videos(
+                session=session,
                 channel=channel,
                 url=url,
                 max_videos_per_channel=max_videos_per_channel,
@@ -173,6 +221,11 @@ def _create_channel_tasks(
     return tasks
 
 
+def _newest_first(videos: list[Video]) -> list[Video]:
+    # channel results are cached, so sort a copy
+    return sorted(videos, key=_sort_by_publish_time)[::-1]
+
+
 def _process_video_results(
     results: list[list[Video]], query: str | None, char_cap: int | None
 ) -> list[Video]:
@@ -180,8 +233,7 @@ def _process_video_results(
     res: list[Video] = []
     for videos in results:
         if not query:
-            videos.sort(key=_sort_by_publish_time)
-            videos = videos[::-1]
+            videos = _newest_first(videos)
         res.extend(videos)
     if char_cap:
         res = _filter_by_char_cap(res, char_cap)
@@ -190,7 +242,7 @@ def _process_video_results(
 
 # cache results for one hour
 @async_threadsafe_ttl_cache(ttl=3600)
-async def youtube_search(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+async def youtube_search(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
     channels: str,
     end_date: str,
     query: str | None = None,
@@ -199,13 +251,13 @@ async def youtube_search(  # pylint: disable=too-many-arguments,too-many-positio
     get_descriptions: bool = False,
     get_transcripts: bool = True,
     char_cap: int | None = None,
+    concurrency: int = 10,
+    session: ClientSession | None = None,
 ) -> list[Video]:
     if not channels:
         raise ValueError("No channels specified")
 
-    channels_arr = _filter_channels(
-        ["@" + channel.replace("@", "") for channel in channels.lower().split(",")]
-    )
+    channels_arr = _filter_channels(channels.split(","))
     if len(channels_arr) == 0:
         return []
 
@@ -217,38 +269,88 @@ async def youtube_search(  # pylint: disable=too-many-arguments,too-many-positio
     )
 
     encoded_search = _build_youtube_search_url(query, period_days, end_date)
-    tasks = _create_channel_tasks(
-        channels_arr,
-        encoded_search,
-        max_videos_per_channel,
-        get_descriptions,
-        get_transcripts,
-    )
+    async with _shared_session(session) as shared_session:
+        tasks = _create_channel_tasks(
+            shared_session,
+            channels_arr,
+            encoded_search,
+            max_videos_per_channel,
+            get_descriptions,
+            get_transcripts,
+        )
 
-    try:
-        results = await asyncio.gather(*tasks)
-    except HTTPException as e:
-        logger.exception(e)
-        raise
-    except Exception as e:
-        logger.exception(e)
-        raise
+        try:
+            results = await bounded_gather(tasks, concurrency)
+        except HTTPException as e:
+            logger.exception(e)
+            raise
+        except Exception as e:
+            logger.exception(e)
+            raise
 
     return _process_video_results(results, query, char_cap)
 
 
+async def youtube_search_stream(  # pylint: disable=too-many-arguments,too-many-positional-arguments,contextmanager-generator-missing-cleanup
+    channels: str,
+    end_date: str,
+    query: str | None = None,
+    period_days: int = 3,
+    max_videos_per_channel: int = 3,
+    get_descriptions: bool = False,
+    get_transcripts: bool = True,
+    concurrency: int = 10,
+    session: ClientSession | None = None,
+) -> AsyncIterator[list[Video]]:
+    """Like youtube_search, but yields each channel's videos as soon as they are in.
+
+    Channels come in the order they finish, and there is no char cap.
+    """
+    channels_arr = _filter_channels(channels.split(","))
+    encoded_search = _build_youtube_search_url(query, period_days, end_date)
+    # callers that stop early should aclose() the generator to close the session
+    async with _shared_session(session) as shared_session:
+        tasks = _create_channel_tasks(
+            shared_session,
+            channels_arr,
+            encoded_search,
+            max_videos_per_channel,
+            get_descriptions,
+            get_transcripts,
+        )
+        for next_done in bounded_as_completed(tasks, concurrency):
+            videos = await next_done
+            yield videos if query else _newest_first(videos)
+
+
 def _filter_by_char_cap(videos: list[Video], char_cap: int) -> list[Video]:
     if char_cap is None:
         return videos
-    while len(json.dumps([vid.model_dump_json() for vid in videos])) > char_cap:
-        transcript_lengths = [len(video.transcript) for video in videos]
-        max_index = transcript_lengths.index(max(transcript_lengths))
-        videos.pop(max_index)
-    return videos
+    # serialize each video once: a JSON list is its items plus brackets and commas
+    sizes = [len(orjson.dumps(vid.model_dump())) for vid in videos]
+    total = sum(sizes) + max(len(sizes) - 1, 0) + 2
+    # drop the longest transcripts first (the earliest one on a tie)
+    dropped = set()
+    for index in sorted(
+        range(len(videos)), key=lambda index: -len(videos[index].transcript or "")
+    ):
+        if total <= char_cap:
+            break
+        dropped.add(index)
+        total -= sizes[index] + (1 if len(dropped) < len(videos) else 0)
+    return [vid for index, vid in enumerate(videos) if index not in dropped]
 
 
 def _sort_by_publish_time(video: Video) -> float:
     now = datetime.now()
+    match = _RELATIVE_TIME_RE.fullmatch(video.publish_time)
+    if match:
+        amount, unit = match.groups()
+        d = now - relativedelta(**{f"{unit}s": int(amount)})
+        return time.mktime(d.timetuple())
+    # dateparser takes ~300ms to import and is only needed for uncommon formats
+    import dateparser  # pylint: disable=import-outside-toplevel
+
     d = dateparser.parse(
         video.publish_time.replace("Streamed ", ""),
         settings={"RELATIVE_BASE": now},
@@ -261,54 +363,89 @@ def youtube_transcripts(
     ids: str,
 ) -> list[VideoTranscript]:
     """Extract transcripts from a list of Youtube video ids."""
-    results: list[VideoTranscript] = []
-    for video_id in ids.split(","):
-        transcript = _get_video_transcript(video_id)
-        results.append(VideoTranscript(id=video_id, text=transcript))
-    return results
+    video_ids = ids.split(",")
+    transcripts = _transcript_executor.map(_get_video_transcript, video_ids)
+    return [
+        VideoTranscript(id=video_id, text=transcript)
+        for video_id, transcript in zip(video_ids, transcripts, strict=True)
+    ]
 
 
 def _filter_channels(channels: list[str]) -> list[str]:
-    data = get_data()
+    """Only allow channels in our data store."""
+    index = get_youtube_index()
     fixed_channels = []
-    for channel_raw in channels:
-        channel = channel_raw.replace("@", "")
-        # look up as partial match in our db
-        found = next((item for item in data if channel in item["Youtube"]), None)
-        if found and found["Youtube"] and found["Youtube"].lower() != "n/a":
-            fixed_channels.append(found["Youtube"])
+    for channel in channels:
+        handle = canonical_handle(channel)
+        if not handle:
+            continue
+        # exact match first, otherwise look up as partial match in our db
+        found = index.get(handle) or next(
+            (value for key, value in index.items() if handle in key), None
+        )
+        if found:
+            fixed_channels.append(found)
     return fixed_channels
 
 
-async def _get_channel_videos(
+# cache per channel too, so streamed searches are served from cache as well
+@async_threadsafe_ttl_cache(ttl=3600)
+async def _get_channel_videos(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    session: ClientSession,
     channel: str,
     url: str,
     max_videos_per_channel: int,
     get_descriptions: bool,
     get_transcripts: bool,
 ) -> list[Video]:
+    html = await _get_channel_html(session, channel, url)
+    videos = _parse_html_list(html, max_results=max_videos_per_channel)
+    # fetch all descriptions and transcripts at once instead of video by video
+    details: list[Coroutine[Any, Any, None]] = []
+    if get_descriptions:
+        details.extend(_add_description(session, video) for video in videos)
+    if get_transcripts:
+        details.extend(_add_transcript(video) for video in videos)
+    await asyncio.gather(*details)
+    return videos
+
+
+async def _get_channel_html(session: ClientSession, channel: str, url: str) -> str:
     # cookie to bypass consent, as found here:
     # https://stackoverflow.com/questions/74127649/is-there-a-way-to-skip-youtubes-before-you-continue-to-youtube-cookies-messag
-    async with ClientSession() as session:
-        response = await session.get(
-            url,
-            headers={"Cookie": "SOCS=CAESEwgDEgk0ODE3Nzk3MjQaAmVuIAEaBgiA_LyaBg"},
-        )
+    headers = {"Cookie": "SOCS=CAESEwgDEgk0ODE3Nzk3MjQaAmVuIAEaBgiA_LyaBg"}
+    cached = _etag_cache.get(url)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    # release the connection to the shared session's pool, error responses included
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and cached:
+            # renew the entry, so a page that keeps being revalidated stays cached
+            _etag_cache[url] = cached
+            return cached[1]
         if response.status != 200:
             raise HTTPException(
                 status_code=400,
                 detail=f'Failed to fetch videos for channel "{channel}". The handle is probably incorrect.',
             )
         html = await response.text()
-        videos = _parse_html_list(html, max_results=max_videos_per_channel)
-        for video in videos:
-            if get_descriptions:
-                video_info = await _get_video_info(session, video.id)
-                video.long_desc = video_info.get("long_desc")
-            if get_transcripts:
-                transcript = _get_video_transcript(video.id)
-                video.transcript = transcript
-        return videos
+        etag = response.headers.get("ETag")
+    if etag:
+        _etag_cache[url] = (etag, html)
+    return html
+
+
+async def _add_description(session: ClientSession, video: Video) -> None:
+    video_info = await _get_video_info(session, video.id)
+    video.long_desc = video_info.get("long_desc")
+
+
+async def _add_transcript(video: Video) -> None:
+    # the transcript api blocks, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    video.transcript = await loop.run_in_executor(
+        _transcript_executor, _get_video_transcript, video.id
+    )
 
 
 async def _get_video_info(session: ClientSession, video_id: str) -> dict[str, str]:
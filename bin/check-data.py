@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Data check script - verifies that the Youtube handles in data/sources.csv resolve.
+
+All handles are checked concurrently with HEAD requests, so we only wait for the
+slowest response instead of the sum of all of them.
+
+Usage:
+    python bin/check-data.py
+
+Exits with a non-zero status when one or more handles did not return a 200.
+"""
+
+import asyncio
+import os
+import sys
+
+from aiohttp import ClientError, ClientSession, TCPConnector
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.store import get_data  # noqa: E402
+
+# cookie to bypass consent, otherwise every handle redirects to a 200 consent page
+CONSENT_COOKIE = "SOCS=CAESEwgDEgk0ODE3Nzk3MjQaAmVuIAEaBgiA_LyaBg"
+
+
+async def _check(
+    session: ClientSession, name: str, handle: str
+) -> tuple[str, str, int | str]:
+    """Return the HTTP status (or the error) for a source's Youtube handle."""
+    url = f"https://www.youtube.com/{handle}"
+    try:
+        async with session.head(url, allow_redirects=True) as response:
+            return name, handle, response.status
+    except (ClientError, TimeoutError) as e:
+        return name, handle, str(e)
+
+
+async def main() -> None:
+    sources = [item for item in get_data() if item["Youtube"] != "n/a"]
+    async with ClientSession(
+        connector=TCPConnector(limit=50),
+        headers={"Cookie": CONSENT_COOKIE},
+    ) as session:
+        results = await asyncio.gather(
+            *(_check(session, item["Name"], item["Youtube"]) for item in sources)
+        )
+
+    failed = [result for result in results if result[2] != 200]
+    for name, handle, status in failed:
+        print(f"{name}: {handle} returned {status}", file=sys.stderr)
+    print(f"checked {len(results)} Youtube handles, {len(failed)} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
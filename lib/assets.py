@@ -0,0 +1,9 @@
+from pathlib import Path
+
+import streamlit as st
+
+
+@st.cache_data(show_spinner=False)
+def load_index_html() -> str:
+    """Read index.html once per process instead of on every rerun."""
+    return Path("index.html").read_text(encoding="utf-8")
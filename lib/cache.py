@@ -3,7 +3,7 @@ from typing import Any
 from cachetools import TTLCache
 from cachetools.keys import hashkey
 
-from lib.parameterized_lock import parameterized_lock
+from lib.parameterized_lock import async_parameterized_lock, parameterized_lock
 
 
 def async_threadsafe_ttl_cache(func: Any = None, ttl: int = 60) -> Any:
@@ -11,12 +11,14 @@ def async_threadsafe_ttl_cache(func: Any = None, ttl: int = 60) -> Any:
 
     def decorator(decorated_func: Any) -> Any:
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Does not use 'session' in the key
-            kwargs_for_key = {k: v for k, v in kwargs.items() if k != "session"}
+            # Does not use 'session' or 'concurrency' in the key
+            kwargs_for_key = {
+                k: v for k, v in kwargs.items() if k not in ("session", "concurrency")
+            }
             key = hashkey(*args, **kwargs_for_key)
             if key in cache:
                 return cache[key]
-            with parameterized_lock(key):
+            async with async_parameterized_lock(key):
                 if key in cache:
                     return cache[key]
                 cache[key] = await decorated_func(*args, **kwargs)
@@ -33,8 +35,10 @@ def sync_threadsafe_ttl_cache(func: Any = None, ttl: int = 60) -> Any:
 
     def decorator(decorated_func: Any) -> Any:
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Does not use 'session' in the key
-            kwargs_for_key = {k: v for k, v in kwargs.items() if k != "session"}
+            # Does not use 'session' or 'concurrency' in the key
+            kwargs_for_key = {
+                k: v for k, v in kwargs.items() if k not in ("session", "concurrency")
+            }
             key = hashkey(*args, **kwargs_for_key)
             if key in cache:
                 return cache[key]
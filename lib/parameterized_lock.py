@@ -1,11 +1,14 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
 from threading import Lock
 from typing import Any
 
 namespace_lock = Lock()
 namespace: dict[str, Lock] = {}
 counters: dict[str, int] = {}
+async_namespace: dict[Any, asyncio.Lock] = {}
+async_counters: dict[Any, int] = {}
 
 
 @contextmanager
@@ -32,3 +35,29 @@ def parameterized_lock(
                 counters[value] -= 1
                 lock = namespace[value]
         lock.release()
+
+
+@asynccontextmanager
+async def async_parameterized_lock(value: Any) -> AsyncGenerator[None, None]:
+    """Like parameterized_lock, but awaits the lock instead of blocking the event loop.
+
+    Asyncio locks are bound to a loop, so the locks are kept per running loop.
+    """
+    key = (asyncio.get_running_loop(), value)
+    with namespace_lock:
+        if key in async_namespace:
+            async_counters[key] += 1
+        else:
+            async_namespace[key] = asyncio.Lock()
+            async_counters[key] = 1
+        lock = async_namespace[key]
+    try:
+        async with lock:
+            yield
+    finally:
+        with namespace_lock:
+            if async_counters[key] == 1:
+                del async_counters[key]
+                del async_namespace[key]
+            else:
+                async_counters[key] -= 1
@@ -0,0 +1,272 @@
+import asyncio
+import html
+import logging
+import time
+from collections.abc import AsyncIterator, Coroutine, Iterator, Sequence
+from datetime import date
+from os import getenv
+from threading import Thread
+from typing import Any, TypeVar
+
+import orjson
+import streamlit as st
+from aiohttp import ClientSession
+from pydantic import BaseModel
+
+from api.store import get_column_values
+from api.substack import SubstackPost, substack_search
+from api.x import Tweet, x_search
+from api.youtube import Video, youtube_search, youtube_search_stream
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SEARCH_TTL = 3600
+"""How long the Youtube and X search results are cached"""
+
+YOUTUBE_DEFAULT_CHANNELS = ["@thegrayzone7996", "@aljazeeraenglish", "@DemocracyNow"]
+X_DEFAULT_USERS = ["AJEnglish", "democracynow", "TheGrayzoneNews"]
+
+VIDEO_EMBED_HEIGHT = 325
+"""Height of an embedded video, including the gap below it"""
+
+
+@st.cache_resource
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """One event loop for all sessions and reruns, running in a background thread.
+
+    Unlike asyncio.run per rerun, this keeps loop-bound clients and their pooled
+    connections alive between searches.
+    """
+    loop = asyncio.new_event_loop()
+    Thread(target=loop.run_forever, name="ui-event-loop", daemon=True).start()
+    return loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+
+async def _anext(iterator: AsyncIterator[T]) -> T:
+    return await anext(iterator)
+
+
+def iterate_async(iterator: AsyncIterator[T]) -> Iterator[T]:
+    """Iterate an async iterator from the script thread, on the shared event loop."""
+    loop = _event_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(_anext(iterator), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        if hasattr(iterator, "aclose"):
+            asyncio.run_coroutine_threadsafe(iterator.aclose(), loop).result()
+
+
+async def _create_client_session() -> ClientSession:
+    return ClientSession()
+
+
+@st.cache_resource
+def _client_session() -> ClientSession:
+    """The aiohttp session shared by all Youtube searches, bound to the shared loop."""
+    return run_async(_create_client_session())
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def source_values(column: str) -> list[str]:
+    """Returns the sources' values for a column, leaving out the ones set to n/a."""
+    return [value for value in get_column_values(column) if value != "n/a"]
+
+
+def to_json(models: Sequence[BaseModel]) -> str:
+    """Serialize results for st.json with orjson.
+
+    st.json passes a string through as is, instead of running json.dumps itself.
+    """
+    return orjson.dumps([model.model_dump() for model in models]).decode()
+
+
+def video_embeds_html(videos: list[Video]) -> str:
+    """One html block with a lazy loading Youtube embed per video.
+
+    Rendering all videos in a single component is one element for Streamlit to
+    diff, and the browser only loads the embeds that are scrolled into view.
+    """
+    return "".join(
+        '<iframe width="560" height="315" loading="lazy"'
+        ' style="display: block; margin-bottom: 10px"'
+        f' src="https://www.youtube.com/embed/{html.escape(video.id)}"'
+        f' title="{html.escape(video.title)}" frameborder="0"'
+        ' allow="encrypted-media; picture-in-picture" allowfullscreen></iframe>'
+        for video in videos
+    )
+
+
+def int_param(
+    params: dict[str, str], name: str, default: int, low: int, high: int
+) -> int:
+    """An integer query param clamped to [low, high], or the default if it's not valid."""
+    try:
+        return min(max(int(params[name]), low), high)
+    except (KeyError, ValueError):
+        return default
+
+
+def bool_param(params: dict[str, str], name: str, default: bool) -> bool:
+    """A boolean query param, where "false", "0", "no" and "off" are false."""
+    if name not in params:
+        return default
+    return params[name].lower() not in ("false", "0", "no", "off")
+
+
+def concurrency_slider(what: str) -> int:
+    """Sidebar slider bounding how many requests a search runs at the same time."""
+    return st.sidebar.slider(
+        "Max concurrent requests",
+        1,
+        25,
+        10,
+        help=f"How many {what} are fetched at the same time.",
+    )
+
+
+@st.cache_data(ttl=SEARCH_TTL, show_spinner="Searching...")
+def cached_youtube_search(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    query: str,
+    channels: str,
+    period_days: int,
+    end_date: str,
+    max_videos_per_channel: int,
+    get_transcripts: bool,
+    _concurrency: int = 10,
+) -> list[Video]:
+    return run_async(
+        youtube_search(
+            query=query,
+            channels=channels,
+            period_days=period_days,
+            end_date=end_date,
+            max_videos_per_channel=max_videos_per_channel,
+            get_transcripts=get_transcripts,
+            concurrency=_concurrency,
+            session=_client_session(),
+        )
+    )
+
+
+def stream_youtube_search(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    query: str,
+    channels: str,
+    period_days: int,
+    end_date: str,
+    max_videos_per_channel: int,
+    concurrency: int = 10,
+) -> Iterator[list[Video]]:
+    """Yields each channel's videos as soon as they are in, for rendering right away.
+
+    The channel results are cached by the api, so this is fast after a first search.
+    """
+    return iterate_async(
+        youtube_search_stream(
+            query=query,
+            channels=channels,
+            period_days=period_days,
+            end_date=end_date,
+            max_videos_per_channel=max_videos_per_channel,
+            get_transcripts=False,
+            concurrency=concurrency,
+            session=_client_session(),
+        )
+    )
+
+
+@st.cache_data(ttl=SEARCH_TTL, show_spinner="Searching...")
+def cached_x_search(
+    query: str,
+    users: str,
+    period_days: int,
+    end_date: str,
+    max_tweets_per_user: int,
+) -> list[Tweet]:
+    tweets = run_async(
+        x_search(users, query, period_days, end_date, max_tweets_per_user)
+    )
+    # twikit tweets hold on to the client, so convert them like the api response does
+    return [Tweet.model_validate(tweet, from_attributes=True) for tweet in tweets]
+
+
+@st.cache_data(ttl=86400, show_spinner="Searching...")
+def cached_substack_search(
+    query: str,
+    publications: str,
+    max_posts_per_publication: int,
+    get_content: bool,
+    _concurrency: int = 10,
+) -> list[SubstackPost]:
+    return run_async(
+        substack_search(
+            publications,
+            query,
+            max_posts_per_publication,
+            get_content,
+            concurrency=_concurrency,
+        )
+    )
+
+
+async def _warm_default_searches(session: ClientSession) -> None:
+    # same arguments as the pages pass for their untouched defaults, so this fills
+    # the api caches behind them: the per channel Youtube results the video view
+    # streams from, and the X search that cached_x_search wraps
+    end_date = date.today().strftime("%Y-%m-%d")
+    await youtube_search(
+        query="",
+        channels=",".join(YOUTUBE_DEFAULT_CHANNELS),
+        period_days=3,
+        end_date=end_date,
+        max_videos_per_channel=2,
+        get_transcripts=False,
+        session=session,
+    )
+    await x_search(",".join(X_DEFAULT_USERS), "", 3, end_date, 20)
+
+
+def _warm_forever(loop: asyncio.AbstractEventLoop, session: ClientSession) -> None:
+    # no Streamlit calls in here: this thread has no ScriptRunContext
+    while True:
+        try:
+            asyncio.run_coroutine_threadsafe(
+                _warm_default_searches(session), loop
+            ).result()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Warming the default searches failed")
+        # refreshing before the results expired would only hit the cache
+        time.sleep(SEARCH_TTL + 5)
+
+
+@st.cache_resource
+def start_cache_warmer() -> Thread | None:
+    """Keep the default Youtube and X searches cached, when WARM_CACHE is set.
+
+    Without it the first visitor after every expiry waits for a cold fetch.
+    """
+    if not getenv("WARM_CACHE"):
+        return None
+    thread = Thread(
+        target=_warm_forever,
+        args=(_event_loop(), _client_session()),
+        name="ui-cache-warmer",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+# every page imports this module, so the warmer starts with whichever page is
+# visited first after a deploy
+start_cache_warmer()
@@ -1,10 +1,37 @@
-from datetime import datetime, timedelta
+import asyncio
+from collections.abc import Awaitable, Iterable, Iterator
+from datetime import date, datetime, timedelta
+from typing import TypeVar
 
+T = TypeVar("T")
 
-def get_since_date(period_days: int = 3, end_date: str | None = None) -> list[int]:
-    end_date_obj: datetime
-    end_date_obj = (
-        datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.today()
+
+def get_since_date(period_days: int = 3, end_date: str | None = None) -> date:
+    end_date_obj: date = (
+        datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else date.today()
     )
-    since: datetime = end_date_obj - timedelta(days=period_days)
-    return [since.year, since.month, since.day]
+    return end_date_obj - timedelta(days=period_days)
+
+
+async def bounded_gather(aws: Iterable[Awaitable[T]], concurrency: int = 10) -> list[T]:
+    """Like asyncio.gather, but runs at most `concurrency` awaitables at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
+
+
+def bounded_as_completed(
+    aws: Iterable[Awaitable[T]], concurrency: int = 10
+) -> Iterator[Awaitable[T]]:
+    """Like asyncio.as_completed, but runs at most `concurrency` awaitables at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return asyncio.as_completed([run(aw) for aw in aws])
@@ -1,11 +1,11 @@
 import streamlit as st
 import streamlit.components.v1 as components
 
-from api.main import get_source_names, search_media
+from api.main import search_media
+from lib.assets import load_index_html
+from lib.ui import source_values
 
-with open("index.html", encoding="utf-8") as f:
-    html_code = f.read()
-    components.html(html_code, height=0)
+components.html(load_index_html(), height=0)
 
 st.sidebar.title("Indy News Search")
 st.title("Search media outlets")
@@ -16,10 +16,10 @@ st.markdown(
 )
 sources = st.multiselect(
     "Select one or more names of sources...",
-    get_source_names(),
+    source_values("Name"),
     default=["The Grayzone", "Al Jazeera", "Democracy Now"],
 )
 
-media = search_media(",".join(sources))
+media = search_media(",".join(sources), None)
 
 st.json(media, expanded=True)
@@ -1,16 +1,25 @@
-import asyncio
-
 import streamlit as st
 import streamlit.components.v1 as components
 
-from api.main import get_youtube_channels
-from api.youtube import youtube_search
+from lib.assets import load_index_html
+from lib.ui import (
+    VIDEO_EMBED_HEIGHT,
+    YOUTUBE_DEFAULT_CHANNELS,
+    bool_param,
+    cached_youtube_search,
+    concurrency_slider,
+    int_param,
+    source_values,
+    stream_youtube_search,
+    to_json,
+    video_embeds_html,
+)
 
-with open("index.html", encoding="utf-8") as f:
-    html_code = f.read()
-    components.html(html_code, height=0)
+components.html(load_index_html(), height=0)
+params = st.query_params.to_dict()
 
 st.sidebar.title("Indy News Search")
+concurrency = concurrency_slider("channels")
 st.title("Youtube overview by topic")
 st.markdown(
     """
@@ -22,75 +31,71 @@ query = st.text_input(
     "Topic (leave empty to get latest)...",
     placeholder="israel",
     max_chars=255,
-    value=(st.query_params.query if "query" in st.query_params else ""),
+    value=params.get("query", ""),
 )
 channels = st.multiselect(
     "Provide one or more channels to search in...",
-    [channel for channel in get_youtube_channels() if channel != "n/a"],
-    default=["@thegrayzone7996", "@aljazeeraenglish", "@DemocracyNow"],
+    source_values("Youtube"),
+    default=YOUTUBE_DEFAULT_CHANNELS,
 )
 
 max_videos_per_channel = st.slider(
     "Select max number of videos per channel",
     1,
     25,
-    (
-        st.query_params.max_videos_per_channel
-        if "max_videos_per_channel" in st.query_params
-        else 2
-    ),
+    int_param(params, "max_videos_per_channel", 2, 1, 25),
 )
 end_date = st.date_input(
     "End date (defaults to today)",
     value="today",
 )
-period_days = int(
-    st.text_input(
-        "Period (days up till end_date)",
-        st.query_params.period_days if "period_days" in st.query_params else 3,
-    ),
+period_days = st.number_input(
+    "Period (days up till end_date)",
+    min_value=1,
+    max_value=90,
+    value=int_param(params, "period_days", 3, 1, 90),
+    step=1,
 )
 show_as_videos = st.checkbox(
     "Show as videos",
-    value=(
-        st.query_params.show_as_videos if "show_as_videos" in st.query_params else True
-    ),
+    value=bool_param(params, "show_as_videos", True),
 )
 
 get_transcripts = False
 if not show_as_videos:
     get_transcripts = st.checkbox(
         "Get transcripts",
-        value=(
-            st.query_params.get_transcripts
-            if "get_transcripts" in st.query_params
-            else False
-        ),
+        value=bool_param(params, "get_transcripts", False),
     )
 
 if not channels or channels == "":
     st.warning("Select at least one or more channels and potentially a query")
     st.stop()
 
-
-async def get_youtube_results() -> None:
-    results = await youtube_search(
-        query=query,
-        channels=",".join(channels),
-        period_days=period_days,
-        end_date=end_date.strftime("%Y-%m-%d"),
-        max_videos_per_channel=max_videos_per_channel,
-        get_transcripts=get_transcripts,
+if show_as_videos:
+    # render every channel's videos as soon as they are in
+    with st.spinner("Searching..."):
+        for videos in stream_youtube_search(
+            query,
+            ",".join(channels),
+            period_days,
+            end_date.strftime("%Y-%m-%d"),
+            max_videos_per_channel,
+            concurrency,
+        ):
+            if videos:
+                components.html(
+                    video_embeds_html(videos),
+                    height=len(videos) * VIDEO_EMBED_HEIGHT,
+                )
+else:
+    results = cached_youtube_search(
+        query,
+        ",".join(channels),
+        period_days,
+        end_date.strftime("%Y-%m-%d"),
+        max_videos_per_channel,
+        get_transcripts,
+        concurrency,
     )
-
-    if show_as_videos:
-        for item in results:
-            #     st.markdown(
-            #         f"[{item['title']}](https://www.youtube.com{item['url_suffix']})",
-            #     )
-            st.video(f"https://www.youtube.com{item.url_suffix}")
-    else:
-        st.json(results, expanded=True)
-
-
-asyncio.run(get_youtube_results())
+    st.json(to_json(results), expanded=True)
@@ -1,14 +1,17 @@
-import asyncio
-
 import streamlit as st
 import streamlit.components.v1 as components
 
-from api.main import get_x_users
-from api.x import x_search
+from lib.assets import load_index_html
+from lib.ui import (
+    X_DEFAULT_USERS,
+    cached_x_search,
+    int_param,
+    source_values,
+    to_json,
+)
 
-with open("index.html", encoding="utf-8") as f:
-    html_code = f.read()
-    components.html(html_code, height=0)
+components.html(load_index_html(), height=0)
+params = st.query_params.to_dict()
 
 st.sidebar.title("Indy News Search")
 st.title("X/Twitter overview by topic")
@@ -22,50 +25,42 @@ query = st.text_input(
     "Topic (leave empty to get latest)...",
     placeholder="israel",
     max_chars=255,
-    value=(st.query_params.query if "query" in st.query_params else ""),
+    value=params.get("query", ""),
 )
 users = st.multiselect(
     "Provide one or more X users to search in...",
-    [user for user in get_x_users() if user != "n/a"],
-    default=["AJEnglish", "democracynow", "TheGrayzoneNews"],
+    source_values("X"),
+    default=X_DEFAULT_USERS,
 )
 
 max_tweets_per_user = st.slider(
     "Select max number of tweets per user",
     1,
     50,
-    (
-        st.query_params.max_tweets_per_user
-        if "max_tweets_per_user" in st.query_params
-        else 20
-    ),
+    int_param(params, "max_tweets_per_user", 20, 1, 50),
 )
 end_date = st.date_input(
     "End date (defaults to today)",
     value="today",
 )
-period_days = int(
-    st.text_input(
-        "Period (days up till end_date)",
-        st.query_params.period_days if "period_days" in st.query_params else 3,
-    ),
+period_days = st.number_input(
+    "Period (days up till end_date)",
+    min_value=1,
+    max_value=90,
+    value=int_param(params, "period_days", 3, 1, 90),
+    step=1,
 )
 
 if not users or users == "":
     st.warning("Select at least one or more users and potentially a query")
     st.stop()
 
+results = cached_x_search(
+    query,
+    ",".join(users),
+    period_days,
+    end_date.strftime("%Y-%m-%d"),
+    max_tweets_per_user,
+)
 
-async def get_x_results() -> None:
-    results = await x_search(
-        query=query,
-        users=",".join(users),
-        period_days=period_days,
-        end_date=end_date.strftime("%Y-%m-%d"),
-        max_tweets_per_user=max_tweets_per_user,
-    )
-
-    st.json(results, expanded=True)
-
-
-asyncio.run(get_x_results())
+st.json(to_json(results), expanded=True)
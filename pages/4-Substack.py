@@ -1,16 +1,21 @@
-import asyncio
-
 import streamlit as st
 import streamlit.components.v1 as components
 
-from api.main import get_substack_publications
-from api.substack import substack_search
+from lib.assets import load_index_html
+from lib.ui import (
+    bool_param,
+    cached_substack_search,
+    concurrency_slider,
+    int_param,
+    source_values,
+    to_json,
+)
 
-with open("index.html", encoding="utf-8") as f:
-    html_code = f.read()
-    components.html(html_code, height=0)
+components.html(load_index_html(), height=0)
+params = st.query_params.to_dict()
 
 st.sidebar.title("Indy News Search")
+concurrency = concurrency_slider("publications")
 st.title("Substack posts overview by topic")
 st.markdown(
     """
@@ -22,11 +27,11 @@ query = st.text_input(
     "Topic (leave empty to get latest)...",
     placeholder="israel",
     max_chars=255,
-    value=(st.query_params.query if "query" in st.query_params else ""),
+    value=params.get("query", ""),
 )
 publications = st.multiselect(
     "Provide one or more Substack publications to search in...",
-    [pub for pub in get_substack_publications() if pub != "n/a"],
+    source_values("Substack"),
     default=[],
 )
 
@@ -34,32 +39,24 @@ max_posts_per_publication = st.slider(
     "Select max number of posts per publication",
     1,
     25,
-    (
-        st.query_params.max_posts_per_publication
-        if "max_posts_per_publication" in st.query_params
-        else 10
-    ),
+    int_param(params, "max_posts_per_publication", 10, 1, 25),
 )
 
 get_content = st.checkbox(
     "Get full post content (slower)",
-    value=(st.query_params.get_content if "get_content" in st.query_params else True),
+    value=bool_param(params, "get_content", True),
 )
 
 if not publications or publications == "":
     st.warning("Select at least one or more publications and potentially a query")
     st.stop()
 
+results = cached_substack_search(
+    query,
+    ",".join(publications),
+    max_posts_per_publication,
+    get_content,
+    concurrency,
+)
 
-async def get_substack_results() -> None:
-    results = await substack_search(
-        query=query,
-        publications=",".join(publications),
-        max_posts_per_publication=max_posts_per_publication,
-        get_content=get_content,
-    )
-
-    st.json(results, expanded=True)
-
-
-asyncio.run(get_substack_results())
+st.json(to_json(results), expanded=True)
@@ -3,10 +3,10 @@ Integration tests for API endpoints.
 These tests exercise the full request/response cycle, mocking only external dependencies.
 """
 
-import os
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
-from unittest.mock import mock_open, patch
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -14,25 +14,28 @@ from fastapi.testclient import TestClient
 from api.main import app
 
 
-@pytest.fixture
-def client() -> TestClient:
-    """Fixture to provide a test client"""
-    return TestClient(app)
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    """Fixture to provide a test client, started once for the whole session"""
+    with TestClient(app) as c:
+        yield c
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_key() -> str:
     """Fixture to provide test API key"""
     return "test_api_key_12345"
 
 
-@pytest.fixture(autouse=True)
-def setup_api_key(api_key: str):
-    """Automatically set up API key for all tests"""
-    os.environ["API_KEY"] = api_key
+@pytest.fixture(scope="module", autouse=True)
+def setup_api_key(api_key: str) -> Iterator[None]:
+    """Automatically set up API key for this module's tests, restoring it after"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("API_KEY", api_key)
+        yield
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_csv_data() -> str:
     """Mock CSV data for testing"""
     return """Name,X,Youtube,Substack,Website,About,TrustFactors,Topics
@@ -40,6 +43,20 @@ Al Jazeera,@ajenglish,@aljazeeraenglish,n/a,https://aljazeera.com,International
 Democracy Now,@democracynow,@democracynow,democracynow,https://democracynow.org,Independent news,Grassroots,Politics"""
 
 
+@pytest.fixture(scope="session")
+def mock_csv_file(tmp_path_factory: pytest.TempPathFactory, mock_csv_data: str) -> Path:
+    """Mock CSV data written to a real file once per session"""
+    path = tmp_path_factory.mktemp("store") / "sources.csv"
+    path.write_text(mock_csv_data)
+    return path
+
+
+@pytest.fixture
+def use_mock_csv(mock_csv_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Point the store at the mock CSV file"""
+    monkeypatch.setattr("api.store.CSV_PATH", str(mock_csv_file))
+
+
 class TestAuthentication:
     """Test API authentication enforcement"""
 
@@ -70,44 +87,41 @@ class TestDataEndpoints:
     """Test data query endpoints - these test actual business logic"""
 
     def test_sources_endpoint_returns_minimal_fields(
-        self, client: TestClient, api_key: str, mock_csv_data: str
+        self, client: TestClient, api_key: str, use_mock_csv: None
     ):
         """Test /sources returns only Name, About, Topics"""
-        with patch("builtins.open", mock_open(read_data=mock_csv_data)):
-            response = client.get(f"/sources?apikey={api_key}")
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 2
-            # Verify only minimal fields returned
-            assert set(data[0].keys()) == {"Name", "Media", "About", "Topics"}
-            assert data[0]["Name"] == "Al Jazeera"
+        response = client.get(f"/sources?apikey={api_key}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 2
+        # Verify only minimal fields returned
+        assert set(data[0].keys()) == {"Name", "Media", "About", "Topics"}
+        assert data[0]["Name"] == "Al Jazeera"
 
     def test_source_media_filters_na_values(
-        self, client: TestClient, api_key: str, mock_csv_data: str
+        self, client: TestClient, api_key: str, use_mock_csv: None
     ) -> None:
         """Test /source-media converts 'n/a' to None"""
-        with patch("builtins.open", mock_open(read_data=mock_csv_data)):
-            response = client.get(f"/source-media?sources=Al Jazeera&apikey={api_key}")
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 1
-            assert data[0]["Substack"] is None  # Was "n/a" in CSV
-            assert data[0]["Youtube"] == "@aljazeeraenglish"
+        response = client.get(f"/source-media?sources=Al Jazeera&apikey={api_key}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["Substack"] is None  # Was "n/a" in CSV
+        assert data[0]["Youtube"] == "@aljazeeraenglish"
 
     def test_media_search_exact_match_only(
-        self, client: TestClient, api_key: str, mock_csv_data: str
+        self, client: TestClient, api_key: str, use_mock_csv: None
     ) -> None:
         """Test /media requires exact name match"""
-        with patch("builtins.open", mock_open(read_data=mock_csv_data)):
-            # Exact match should work
-            response = client.get(f"/media?names=Al Jazeera&apikey={api_key}")
-            assert response.status_code == 200
-            assert len(response.json()) == 1
+        # Exact match should work
+        response = client.get(f"/media?names=Al Jazeera&apikey={api_key}")
+        assert response.status_code == 200
+        assert len(response.json()) == 1
 
-            # Partial match should NOT work
-            response = client.get(f"/media?names=Al&apikey={api_key}")
-            assert response.status_code == 200
-            assert len(response.json()) == 0
+        # Partial match should NOT work
+        response = client.get(f"/media?names=Al&apikey={api_key}")
+        assert response.status_code == 200
+        assert len(response.json()) == 0
 
 
 class TestContentEndpointValidation:
@@ -1,13 +1,14 @@
+import os
+from pathlib import Path
 from typing import Dict, List
-from unittest.mock import mock_open, patch
 
 import pandas as pd
 import pytest
 
-from api.store import get_data
+from api.store import canonical_handle, get_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_json_data() -> List[Dict[str, str]]:
     """Fixture to provide sample media data"""
     return [
@@ -24,20 +25,63 @@ def mock_json_data() -> List[Dict[str, str]]:
     ]
 
 
+@pytest.fixture(scope="session")
+def store_files(
+    tmp_path_factory: pytest.TempPathFactory,
+    mock_json_data: List[Dict[str, str]],
+) -> Path:
+    """Fixture to write the sample media data to a real CSV file once per session"""
+    d = tmp_path_factory.mktemp("store")
+    pd.DataFrame(mock_json_data).to_csv(d / "sources.csv", index=False)
+    return d
+
+
 class TestStore:
     """Tests for store.py functionality"""
 
     def test_get_data(
         self,
-        mock_json_data: List[Dict[str, str]],
+        store_files: Path,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test get_data function"""
-        df = pd.DataFrame(mock_json_data)
-        with patch("pandas.read_csv", return_value=df):
-            data = get_data()
-            assert len(data) == 1
-            assert isinstance(data, list)
-            assert isinstance(data[0], dict)
-            assert data[0].get("Name") == "Test News"
-            assert data[0].get("Youtube") == "@testnews"
-            assert data[0].get("Substack") == "testnews"
+        monkeypatch.setattr("api.store.CSV_PATH", str(store_files / "sources.csv"))
+        data = get_data()
+        assert len(data) == 1
+        assert isinstance(data, list)
+        assert isinstance(data[0], dict)
+        assert data[0].get("Name") == "Test News"
+        assert data[0].get("Youtube") == "@testnews"
+        assert data[0].get("Substack") == "testnews"
+
+    @pytest.mark.parametrize(
+        "handle",
+        [
+            "@TestNews",
+            "testnews",
+            " @testnews ",
+            "https://www.youtube.com/@TestNews/",
+            "https://m.youtube.com/@testnews",
+            "youtube.com/@testnews",
+        ],
+    )
+    def test_canonical_handle(self, handle: str) -> None:
+        """Test handle spellings and channel urls normalize to one key"""
+        assert canonical_handle(handle) == "testnews"
+
+    def test_get_data_rereads_changed_csv(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test get_data parses once and again only when the CSV changed on disk"""
+        csv_file = tmp_path / "sources.csv"
+        csv_file.write_text("Name,Youtube\nOld,@old\n")
+        monkeypatch.setattr("api.store.CSV_PATH", str(csv_file))
+        data = get_data()
+        assert get_data() is data
+
+        csv_file.write_text("Name,Youtube\nNew,@new\n")
+        mtime_ns = csv_file.stat().st_mtime_ns + 1_000_000_000
+        os.utime(csv_file, ns=(mtime_ns, mtime_ns))
+        assert get_data()[0]["Name"] == "New"
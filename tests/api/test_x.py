@@ -2,58 +2,188 @@
 Unit tests for X/Twitter business logic.
 Tests actual algorithmic functions, not twikit library.
 """
-from typing import List
-from unittest.mock import MagicMock, patch
+from collections import Counter, namedtuple
+from pathlib import Path
+from typing import Callable, List
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from api.x import _filter_users, _max_per_user
+from api.x import (
+    _build_x_search_query,
+    _fetch_tweets,
+    _filter_users,
+    _get_client,
+    _max_per_user,
+    x_search,
+)
+
+# _max_per_user only reads tweet.user.id, so plain tuples do instead of mocks
+FakeUser = namedtuple("FakeUser", ["id"])
+FakeTweet = namedtuple("FakeTweet", ["id", "user"])
+
+
+def make_tweets(**counts: int) -> List[FakeTweet]:
+    """Build `count` tweets per user id, in one comprehension, user by user"""
+    return [
+        FakeTweet(f"{user}_{i}", FakeUser(user))
+        for user, count in counts.items()
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def write_sources(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Callable[[List[str]], None]:
+    """Fixture to point the store at a CSV file holding sources with the given X handles"""
+    csv_file = tmp_path / "sources.csv"
+    monkeypatch.setattr("api.store.CSV_PATH", str(csv_file))
+
+    def write(handles: List[str]) -> None:
+        csv_file.write_text("X\n" + "".join(f"{handle}\n" for handle in handles))
+
+    return write
+
+
+def search_response(
+    tweets: List[FakeTweet], next_page: MagicMock | None = None
+) -> MagicMock:
+    """Build a twikit search result page; only .next() is awaited, so no AsyncMock"""
+    response = MagicMock()
+    response.__iter__.side_effect = lambda: iter(tweets)
+    response.__len__.return_value = len(tweets)
+    response.next = AsyncMock(return_value=next_page)
+    return response
+
+
+@pytest.fixture
+def empty_search_response() -> MagicMock:
+    """Fixture for a search result page without tweets"""
+    return search_response([])
+
+
+@pytest.fixture
+def patched_x_client(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Fixture to replace the module level twikit client with a mock"""
+    mock_client = MagicMock()
+    monkeypatch.setattr("api.x.client", mock_client)
+    return mock_client
+
+
+class TestGetClient:
+    """Test X client authentication"""
+
+    @pytest.mark.asyncio
+    async def test_sets_cookies_from_file(
+        self,
+        patched_x_client: MagicMock,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test cookies from the cookies file are set on the shared client"""
+        cookies_file = tmp_path / "cookies.txt"
+        cookies_file.write_text("auth_token=abc; ct0=def")
+        monkeypatch.setattr("api.x.cookies_file", str(cookies_file))
+
+        result = await _get_client()
+
+        assert result is patched_x_client
+        patched_x_client.set_cookies.assert_called_once_with(
+            {"auth_token": "abc", "ct0": "def"}
+        )
+
+
+class TestFetchTweets:
+    """Test fetching (paged) search results"""
+
+    @pytest.mark.asyncio
+    async def test_empty_results(
+        self, patched_x_client: MagicMock, empty_search_response: MagicMock
+    ) -> None:
+        """Test an empty first page is returned without paging"""
+        patched_x_client.search_tweet = AsyncMock(return_value=empty_search_response)
+
+        result = await _fetch_tweets("news", count=40)
+
+        assert result == []
+        empty_search_response.next.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_follows_full_pages(
+        self,
+        patched_x_client: MagicMock,
+        empty_search_response: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test full pages of 20 are followed until a short page"""
+        monkeypatch.setattr("api.x._sleep", AsyncMock())
+        tweets = make_tweets(user1=20, user2=5)
+        last_page = search_response(tweets[20:], next_page=empty_search_response)
+        first_page = search_response(tweets[:20], next_page=last_page)
+        patched_x_client.search_tweet = AsyncMock(return_value=first_page)
+
+        result = await _fetch_tweets("news", count=40)
+
+        assert result == tweets
+        last_page.next.assert_not_awaited()
 
 
 class TestFilterUsers:
     """Test user handle filtering logic"""
 
-    def test_filters_valid_users(self):
-        """Test returns only users present in source data"""
-        mock_data = [
-            {"X": "user1"},
-            {"X": "user2"},
-            {"X": "user3"},
-        ]
-        with patch("api.x.get_data", return_value=mock_data):
-            result = _filter_users(["user1", "user2", "unknown"])
-            assert len(result) == 2
-            assert "user1" in result
-            assert "user2" in result
-            assert "unknown" not in result
-
-    def test_excludes_na_values(self):
-        """Test filters out 'n/a' values from source data"""
-        mock_data = [
-            {"X": "user1"},
-            {"X": "n/a"},
-            {"X": "user2"},
-        ]
-        with patch("api.x.get_data", return_value=mock_data):
-            result = _filter_users(["user1", "n/a", "user2"])
-            assert len(result) == 2
-            assert "user1" in result
-            assert "user2" in result
-            assert "n/a" not in result
-
-    def test_empty_input(self):
-        """Test with empty user list"""
-        mock_data = [{"X": "user1"}]
-        with patch("api.x.get_data", return_value=mock_data):
-            result = _filter_users([])
-            assert result == []
-
-    def test_no_matches(self):
-        """Test when no users match source data"""
-        mock_data = [{"X": "user1"}, {"X": "user2"}]
-        with patch("api.x.get_data", return_value=mock_data):
-            result = _filter_users(["user3", "user4"])
-            assert result == []
+    @pytest.mark.parametrize(
+        ("handles", "users", "expected"),
+        [
+            pytest.param(
+                ["user1", "user2", "user3"],
+                ["user1", "user2", "unknown"],
+                ["user1", "user2"],
+                id="filters_valid_users",
+            ),
+            pytest.param(
+                ["user1", "n/a", "user2"],
+                ["user1", "n/a", "user2"],
+                ["user1", "user2"],
+                id="excludes_na_values",
+            ),
+            pytest.param(["user1"], [], [], id="empty_input"),
+            pytest.param(["user1", "user2"], ["user3", "user4"], [], id="no_matches"),
+            pytest.param(
+                ["user1", "@SomeUser2", "user3"],
+                ["someuser", "r3"],
+                ["@SomeUser2", "user3"],
+                id="partial_match",
+            ),
+            pytest.param(
+                ["user10", "user1"], ["user1"], ["user1"], id="prefers_exact_match"
+            ),
+        ],
+    )
+    def test_filter_users(
+        self,
+        write_sources: Callable[[List[str]], None],
+        handles: List[str],
+        users: List[str],
+        expected: List[str],
+    ) -> None:
+        """Test only users (partially) matching a source's X handle are kept"""
+        write_sources(handles)
+        assert _filter_users(users) == expected
+
+    def test_exact_match_skips_scan(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test exact matches are looked up instead of scanning all sources"""
+
+        class UnscannableIndex(dict):
+            """Index that fails the test when scanned for a partial match"""
+
+            def items(self):
+                pytest.fail("exact handle triggered the partial match scan")
+
+        index = UnscannableIndex({"user1": "User1", "user2": "user2"})
+        monkeypatch.setattr("api.x.get_x_index", lambda: index)
+
+        assert _filter_users(["USER1", "user2"]) == ["User1", "user2"]
 
 
 class TestMaxPerUser:
@@ -61,44 +191,21 @@ class TestMaxPerUser:
 
     def test_limits_tweets_per_user(self):
         """Test enforces max tweets per user"""
-        tweets = []
-        # Create 10 tweets from user1, 5 from user2
-        for i in range(10):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user1"
-            tweets.append(tweet)
-        for i in range(5):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user2"
-            tweets.append(tweet)
+        tweets = make_tweets(user1=10, user2=5)
 
         result = _max_per_user(tweets, max_tweets_per_user=3)
 
         # Should have 3 from user1, 3 from user2
-        assert len(result) == 6
-        user1_count = sum(1 for t in result if t.user.id == "user1")
-        user2_count = sum(1 for t in result if t.user.id == "user2")
-        assert user1_count == 3
-        assert user2_count == 3
+        assert Counter(t.user.id for t in result) == {"user1": 3, "user2": 3}
 
     def test_preserves_order(self):
         """Test that limiting preserves original tweet order"""
-        tweets = []
-        for i in range(5):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user1"
-            tweet.id = f"tweet_{i}"
-            tweets.append(tweet)
+        tweets = make_tweets(user1=5)
 
         result = _max_per_user(tweets, max_tweets_per_user=3)
 
         # First 3 should be preserved in order
-        assert result[0].id == "tweet_0"
-        assert result[1].id == "tweet_1"
-        assert result[2].id == "tweet_2"
+        assert [t.id for t in result] == ["user1_0", "user1_1", "user1_2"]
 
     def test_empty_list(self):
         """Test with empty tweet list"""
@@ -107,58 +214,85 @@ class TestMaxPerUser:
 
     def test_under_limit(self):
         """Test when all users have fewer tweets than limit"""
-        tweets = []
-        for i in range(2):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = f"user{i}"
-            tweets.append(tweet)
+        tweets = make_tweets(user0=1, user1=1)
 
         result = _max_per_user(tweets, max_tweets_per_user=5)
-        assert len(result) == 2
+        assert result == tweets
 
     def test_single_user(self):
         """Test with tweets from single user"""
-        tweets = []
-        for i in range(10):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user1"
-            tweets.append(tweet)
+        tweets = make_tweets(user1=10)
 
         result = _max_per_user(tweets, max_tweets_per_user=4)
-        assert len(result) == 4
-        assert all(t.user.id == "user1" for t in result)
+        assert Counter(t.user.id for t in result) == {"user1": 4}
 
     def test_multiple_users_uneven_distribution(self):
         """Test with uneven tweet distribution across users"""
-        tweets = []
-        # user1: 8 tweets
-        for i in range(8):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user1"
-            tweets.append(tweet)
-        # user2: 2 tweets
-        for i in range(2):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user2"
-            tweets.append(tweet)
-        # user3: 5 tweets
-        for i in range(5):
-            tweet = MagicMock()
-            tweet.user = MagicMock()
-            tweet.user.id = "user3"
-            tweets.append(tweet)
+        tweets = make_tweets(user1=8, user2=2, user3=5)
 
         result = _max_per_user(tweets, max_tweets_per_user=3)
 
         # Should have 3+2+3 = 8 total (user2 had only 2)
-        assert len(result) == 8
-        user1_count = sum(1 for t in result if t.user.id == "user1")
-        user2_count = sum(1 for t in result if t.user.id == "user2")
-        user3_count = sum(1 for t in result if t.user.id == "user3")
-        assert user1_count == 3
-        assert user2_count == 2
-        assert user3_count == 3
+        counts = Counter(t.user.id for t in result)
+        assert counts == {"user1": 3, "user2": 2, "user3": 3}
+        assert counts.total() == 8
+
+    def test_keeps_interleaved_order(self):
+        """Test tweets are kept in their original order across users"""
+        tweets = [FakeTweet(i, FakeUser(i % 2)) for i in range(6)]
+
+        result = _max_per_user(tweets, max_tweets_per_user=2)
+
+        assert [t.id for t in result] == [0, 1, 2, 3]
+
+    def test_single_pass(self):
+        """Test each tweet's user is read once, plus once more to count a kept one"""
+        reads: List[int] = []
+
+        class CountingUser:
+            """User that records every read of its id"""
+
+            def __init__(self, user_id: int) -> None:
+                self._id = user_id
+
+            @property
+            def id(self) -> int:
+                reads.append(self._id)
+                return self._id
+
+        tweets = [FakeTweet(i, CountingUser(i % 10)) for i in range(1000)]
+
+        result = _max_per_user(tweets, max_tweets_per_user=5)
+
+        assert len(result) == 50
+        assert len(reads) <= len(tweets) + len(result)
+
+
+class TestXSearch:
+    """Test x_search parameter handling"""
+
+    @pytest.mark.asyncio
+    async def test_one_day_period(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the smallest period the X page offers is accepted"""
+        fetch = AsyncMock(return_value=[])
+        monkeypatch.setattr("api.x._fetch_tweets", fetch)
+
+        result = await x_search(None, "one day", period_days=1, end_date="2024-02-05")
+
+        assert result == []
+        fetch.assert_awaited_once_with("since:2024-02-04 until:2024-02-05 one day", 20)
+
+    @pytest.mark.asyncio
+    async def test_zero_day_period(self) -> None:
+        """Test periods under a day are rejected"""
+        with pytest.raises(ValueError, match="period_days must be 1 or more"):
+            await x_search(None, "zero days", period_days=0)
+
+
+class TestBuildXSearchQuery:
+    """Test X search query building"""
+
+    def test_dates_are_zero_padded(self):
+        """Test single digit months and days are zero padded"""
+        result = _build_x_search_query(["from:user1"], "news", 3, "2024-02-05")
+        assert result == "since:2024-02-02 until:2024-02-05 (from:user1) news"
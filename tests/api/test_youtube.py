@@ -2,105 +2,147 @@
 Unit tests for YouTube business logic.
 Tests actual algorithmic functions, not YouTube API or BeautifulSoup.
 """
-from datetime import datetime, timedelta
-from unittest.mock import MagicMock
 
+import asyncio
+import json
+from datetime import datetime
+from functools import cache
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import orjson
 import pytest
+from starlette.exceptions import HTTPException
+
+from api.youtube import (
+    Video,
+    _build_youtube_search_url,
+    _extract_initial_data,
+    _filter_by_char_cap,
+    _filter_channels,
+    _get_channel_html,
+    _get_video_transcript,
+    _parse_html_list,
+    _parse_html_video,
+    _sort_by_publish_time,
+    youtube_search,
+    youtube_search_stream,
+    youtube_transcripts,
+)
+
+# validated once, tests get cheap copies with only their own fields changed
+_VIDEO_TEMPLATE = Video(
+    id="1",
+    title="Test",
+    short_desc="Test",
+    channel="Test",
+    duration="10:00",
+    views="100",
+    publish_time="1 day ago",
+    url_suffix="/watch?v=1",
+)
+
+
+# a watch page, with the long description in the second contents item
+_VIDEO_PAGE_HTML = """<script>var ytInitialData = {"contents": {"twoColumnWatchNextResults": {
+"results": {"results": {"contents": [{"videoPrimaryInfoRenderer": {}},
+{"videoSecondaryInfoRenderer": {"attributedDescription": {"content": "Long desc"}}}
+]}}}}};</script>"""
+
+
+def make_video(**overrides: str) -> Video:
+    """Build a Video from test defaults, overriding only the fields a test cares about"""
+    return _VIDEO_TEMPLATE.model_copy(update=overrides)
+
+
+def mock_response(status: int, text: str = "", etag: str | None = None) -> MagicMock:
+    """Build an aiohttp response mock, with a plain coroutine function for .text()"""
+
+    async def read_text() -> str:
+        return text
+
+    response = MagicMock(
+        status=status, headers={"ETag": etag} if etag else {}, text=read_text
+    )
+    # session.get() is used as `async with`, which yields the response itself
+    response.__aenter__.return_value = response
+    return response
+
 
-from api.youtube import Video, _filter_by_char_cap, _sort_by_publish_time
+def mock_session(*responses: MagicMock) -> MagicMock:
+    """Build an aiohttp session mock answering GET requests with responses in turn"""
+    return MagicMock(get=MagicMock(side_effect=responses))
 
 
+@cache
+def channel_page(*video_ids: str) -> str:
+    """Build a channel search page listing the given videos, once per set of ids"""
+    videos = [
+        {
+            "videoRenderer": {
+                "videoId": video_id,
+                "title": {"runs": [{"text": f"Title {video_id}"}]},
+                "longBylineText": {"runs": [{"text": "Channel"}]},
+                "navigationEndpoint": {
+                    "commandMetadata": {
+                        "webCommandMetadata": {"url": f"/watch?v={video_id}"}
+                    }
+                },
+            }
+        }
+        for video_id in video_ids
+    ]
+    data = {
+        "contents": {
+            "twoColumnBrowseResultsRenderer": {
+                "tabs": [
+                    {"tabRenderer": {}},
+                    {
+                        "expandableTabRenderer": {
+                            "content": {
+                                "sectionListRenderer": {
+                                    "contents": [
+                                        {"itemSectionRenderer": {"contents": videos}}
+                                    ]
+                                }
+                            }
+                        }
+                    },
+                ]
+            }
+        }
+    }
+    return f"<script>var ytInitialData = {json.dumps(data)};</script>"
+
+
+@pytest.mark.usefixtures("frozen_now")
 class TestSortByPublishTime:
     """Test publish time parsing logic - converts relative times to timestamps"""
 
-    def test_hours_ago(self):
-        """Test parsing 'X hours ago'"""
-        video = Video(
-            id="1",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="2 hours ago",
-            url_suffix="/watch?v=1",
-        )
-        timestamp = _sort_by_publish_time(video)
-        # Should be approximately 2 hours ago
-        expected = (datetime.now() - timedelta(hours=2)).timestamp()
-        assert abs(timestamp - expected) < 3600  # Within 1 hour tolerance
-
-    def test_days_ago(self):
-        """Test parsing 'X days ago'"""
-        video = Video(
-            id="1",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="5 days ago",
-            url_suffix="/watch?v=1",
-        )
-        timestamp = _sort_by_publish_time(video)
-        expected = (datetime.now() - timedelta(days=5)).timestamp()
-        assert abs(timestamp - expected) < 86400  # Within 1 day tolerance
-
-    def test_weeks_ago(self):
-        """Test parsing 'X weeks ago'"""
-        video = Video(
-            id="1",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="3 weeks ago",
-            url_suffix="/watch?v=1",
-        )
-        timestamp = _sort_by_publish_time(video)
-        expected = (datetime.now() - timedelta(weeks=3)).timestamp()
-        assert abs(timestamp - expected) < 86400 * 2  # Within 2 days tolerance
-
-    def test_months_ago(self):
-        """Test parsing 'X months ago'"""
-        video = Video(
-            id="1",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="2 months ago",
-            url_suffix="/watch?v=1",
-        )
-        timestamp = _sort_by_publish_time(video)
-        expected = (datetime.now() - timedelta(days=60)).timestamp()
-        # Months are approximate, allow larger tolerance
-        assert abs(timestamp - expected) < 86400 * 7  # Within 1 week
+    @pytest.mark.parametrize(
+        ("publish_time", "expected"),
+        [
+            ("2 hours ago", datetime(2024, 1, 15, 10, 0)),
+            ("5 days ago", datetime(2024, 1, 10, 12, 0)),
+            ("3 weeks ago", datetime(2023, 12, 25, 12, 0)),
+            # calendar months, not 30 day periods
+            ("2 months ago", datetime(2023, 11, 15, 12, 0)),
+            ("1 year ago", datetime(2023, 1, 15, 12, 0)),
+            ("Streamed 1 day ago", datetime(2024, 1, 14, 12, 0)),
+            # not a "X <unit> ago" format, so parsed by dateparser
+            ("yesterday", datetime(2024, 1, 14, 12, 0)),
+        ],
+    )
+    def test_relative_parsing(self, publish_time: str, expected: datetime):
+        """Test parsing 'X <unit> ago' relative to the (frozen) current time"""
+        video = make_video(publish_time=publish_time)
+        assert _sort_by_publish_time(video) == expected.timestamp()
 
     def test_sorting_order(self):
         """Test that more recent videos have higher timestamps"""
-        recent = Video(
-            id="1",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="1 day ago",
-            url_suffix="/watch?v=1",
-        )
-        older = Video(
-            id="2",
-            title="Test",
-            short_desc="Test",
-            channel="Test",
-            duration="10:00",
-            views="100",
-            publish_time="5 days ago",
-            url_suffix="/watch?v=2",
-        )
+        recent = make_video(id="1", publish_time="1 day ago")
+        older = make_video(id="2", publish_time="5 days ago")
         assert _sort_by_publish_time(recent) > _sort_by_publish_time(older)
 
 
@@ -114,87 +156,24 @@ class TestFilterByCharCap:
 
     def test_no_cap(self):
         """Test with None cap returns all videos"""
-        videos = [
-            Video(
-                id="1",
-                title="Test",
-                short_desc="Test",
-                channel="Test",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=1",
-                transcript="Short transcript",
-            )
-        ]
+        videos = [make_video(transcript="Short transcript")]
         result = _filter_by_char_cap(videos, None)
-        assert len(result) == 1
+        assert result == videos
 
     def test_under_cap(self):
         """Test all videos fit under cap"""
         videos = [
-            Video(
-                id="1",
-                title="Test",
-                short_desc="Desc",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=1",
-                transcript="Short",
-            ),
-            Video(
-                id="2",
-                title="Test2",
-                short_desc="Desc2",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=2",
-                transcript="Short",
-            ),
+            make_video(id="1", transcript="Short"),
+            make_video(id="2", title="Test2", transcript="Short"),
         ]
         result = _filter_by_char_cap(videos, 10000)
-        assert len(result) == 2
+        assert result == videos
 
     def test_truncates_to_fit(self):
         """Test truncation when videos exceed cap"""
         videos = [
-            Video(
-                id="1",
-                title="Test",
-                short_desc="Desc",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=1",
-                transcript="x" * 500,  # 500 chars
-            ),
-            Video(
-                id="2",
-                title="Test2",
-                short_desc="Desc2",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=2",
-                transcript="y" * 500,  # 500 chars
-            ),
-            Video(
-                id="3",
-                title="Test3",
-                short_desc="Desc3",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix="/watch?v=3",
-                transcript="z" * 500,  # 500 chars
-            ),
+            make_video(id=str(i), transcript=char * 500)  # 500 chars
+            for i, char in enumerate("xyz", start=1)
         ]
         # Cap allows roughly 2 videos
         result = _filter_by_char_cap(videos, 1200)
@@ -204,39 +183,282 @@ class TestFilterByCharCap:
 
     def test_character_counting(self):
         """Test that character counting includes all fields"""
-        video = Video(
-            id="123",
-            title="Title",
-            short_desc="Description",
-            channel="Channel",
-            duration="10:00",
-            views="1000",
-            publish_time="1 day ago",
-            url_suffix="/watch?v=123",
-            transcript="Transcript text",
-        )
-        videos = [video]
+        videos = [make_video(id="123", transcript="Transcript text")]
         # Tight cap should exclude the video
         result = _filter_by_char_cap(videos, 10)
-        assert len(result) == 0
+        assert result == []
 
     def test_preserves_order(self):
         """Test that filtering preserves original order"""
-        videos = [
-            Video(
-                id=str(i),
-                title=f"Test{i}",
-                short_desc="Desc",
-                channel="Ch",
-                duration="10:00",
-                views="100",
-                publish_time="1 day ago",
-                url_suffix=f"/watch?v={i}",
-                transcript="x" * 100,
-            )
-            for i in range(5)
-        ]
+        videos = [make_video(id=str(i), transcript="x" * 100) for i in range(5)]
         result = _filter_by_char_cap(videos, 1000)
         # Check IDs are in order
-        for i in range(len(result) - 1):
-            assert int(result[i].id) < int(result[i + 1].id)
+        ids = [int(v.id) for v in result]
+        assert ids == sorted(ids)
+
+    def test_missing_transcripts(self):
+        """Test videos without transcript are counted as empty ones"""
+        videos = [
+            make_video(id="1", transcript=None),
+            make_video(id="2", transcript="x" * 500),
+        ]
+        result = _filter_by_char_cap(videos, 500)
+        assert [v.id for v in result] == ["1"]
+
+    def test_serializes_each_video_once(self, monkeypatch: pytest.MonkeyPatch):
+        """Test videos are measured once instead of once per dropped video"""
+        dumps = MagicMock(wraps=orjson.dumps)
+        monkeypatch.setattr("api.youtube.orjson", SimpleNamespace(dumps=dumps))
+        videos = [make_video(id=str(i), transcript="x" * 1000) for i in range(20)]
+
+        result = _filter_by_char_cap(videos, 10_000)
+
+        assert 0 < len(result) < len(videos)
+        assert dumps.call_count == len(videos)
+
+
+class TestExtractInitialData:
+    """Test locating the ytInitialData JSON embedded in Youtube pages"""
+
+    def test_var_assignment(self):
+        """Test the regular `var ytInitialData = {...};` assignment"""
+        html = '<script>var ytInitialData = {"a": {"b": 1}};</script>'
+        assert _extract_initial_data(html) == {"a": {"b": 1}}
+
+    def test_whitespace_and_window_assignment(self):
+        """Test other spellings of the assignment are found too"""
+        html = '<script>window["ytInitialData"]={"a": 1};</script>'
+        assert _extract_initial_data(html) == {"a": 1}
+
+    def test_terminator_inside_string(self):
+        """Test a `};` inside a JSON string does not cut the object short"""
+        html = '<script>var ytInitialData = {"a": "x};y", "b": 2};</script>'
+        assert _extract_initial_data(html) == {"a": "x};y", "b": 2}
+
+    def test_missing(self):
+        """Test pages without ytInitialData return None"""
+        assert _extract_initial_data("<html></html>") is None
+
+
+class TestParseHtmlList:
+    """Test parsing the videos out of a channel search page"""
+
+    def test_parses_videos_with_full_url(self):
+        """Test videos are parsed up to max_results and get their full url"""
+        result = _parse_html_list(channel_page("a", "b", "c"), max_results=2)
+        assert [video.id for video in result] == ["a", "b"]
+        assert result[0].title == "Title a"
+        assert result[0].url_suffix == "/watch?v=a"
+        assert result[0].url == "https://www.youtube.com/watch?v=a"
+
+
+class TestParseHtmlVideo:
+    """Test extracting the long description from a video page"""
+
+    def test_long_description(self):
+        """Test the description is read from the secondary info"""
+        assert _parse_html_video(_VIDEO_PAGE_HTML) == {"long_desc": "Long desc"}
+
+    def test_changed_structure(self):
+        """Test pages without the expected structure give no description"""
+        html = _VIDEO_PAGE_HTML.replace("videoSecondaryInfoRenderer", "other")
+        assert _parse_html_video(html) == {"long_desc": None}
+
+    def test_missing_data(self):
+        """Test pages without ytInitialData give no description"""
+        assert _parse_html_video("<html></html>") == {"long_desc": None}
+
+
+class TestYoutubeTranscripts:
+    """Test fetching transcripts for multiple videos"""
+
+    def test_preserves_order(self, monkeypatch: pytest.MonkeyPatch):
+        """Test transcripts are returned in the order of the requested ids"""
+        monkeypatch.setattr(
+            "api.youtube._get_video_transcript",
+            lambda video_id: f"transcript {video_id}",
+        )
+        result = youtube_transcripts("vid_a,vid_b,vid_c")
+        assert [t.id for t in result] == ["vid_a", "vid_b", "vid_c"]
+        assert [t.text for t in result] == [
+            "transcript vid_a",
+            "transcript vid_b",
+            "transcript vid_c",
+        ]
+
+
+class TestGetVideoTranscript:
+    """Test formatting a single video's transcript"""
+
+    _RAW = [
+        {"text": "Hello", "start": 1.5, "duration": 2.0},
+        {"text": "world", "start": 12.0, "duration": 3.0},
+    ]
+
+    @pytest.mark.parametrize(
+        ("fetched", "strip_timestamps", "expected"),
+        [
+            pytest.param(_RAW, False, "[1s] Hello [12s] world", id="timestamps"),
+            pytest.param(_RAW, True, "Hello world", id="strip_timestamps"),
+            pytest.param(ConnectionError("down"), False, "", id="fetch_error"),
+        ],
+    )
+    def test_transcript(
+        self,
+        fetched: list[dict[str, Any]] | Exception,
+        strip_timestamps: bool,
+        expected: str,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test transcripts are joined, or empty when they can't be fetched"""
+        if isinstance(fetched, Exception):
+            fetch = MagicMock(side_effect=fetched)
+        else:
+            fetch = MagicMock(return_value=MagicMock(to_raw_data=lambda: fetched))
+        monkeypatch.setattr(
+            "api.youtube.YouTubeTranscriptApi", lambda: MagicMock(fetch=fetch)
+        )
+        assert _get_video_transcript("vid", strip_timestamps) == expected
+
+
+class TestFilterChannels:
+    """Test channel filtering against the Youtube handles in our sources"""
+
+    index = {"democracynow": "@DemocracyNow", "aljazeeraenglish": "@aljazeeraenglish"}
+
+    @pytest.fixture(autouse=True)
+    def use_index(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Fixture to look channels up in the index above"""
+        monkeypatch.setattr("api.youtube.get_youtube_index", lambda: self.index)
+
+    def test_exact_match_any_spelling(self):
+        """Test handles match regardless of case, @ or url prefix"""
+        result = _filter_channels(
+            ["democracynow", "https://www.youtube.com/@AlJazeeraEnglish"]
+        )
+        assert result == ["@DemocracyNow", "@aljazeeraenglish"]
+
+    def test_partial_match(self):
+        """Test partial handles still resolve to the source's handle"""
+        assert _filter_channels(["@aljazeera"]) == ["@aljazeeraenglish"]
+
+    def test_unknown_and_empty(self):
+        """Test unknown and empty handles are dropped"""
+        assert _filter_channels(["@unknown", "", "@"]) == []
+
+
+class TestGetChannelHtml:
+    """Test conditional fetching of channel search pages"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_html(self):
+        """Test a 304 answer returns the html stored with the ETag"""
+        url = "https://www.youtube.com/@etag/search?query=a"
+        session = mock_session(mock_response(200, "<html>", '"v1"'), mock_response(304))
+        assert await _get_channel_html(session, "@etag", url) == "<html>"
+        assert await _get_channel_html(session, "@etag", url) == "<html>"
+        first, second = session.get.call_args_list
+        assert "If-None-Match" not in first.kwargs["headers"]
+        assert second.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_without_etag(self):
+        """Test pages without an ETag are fetched unconditionally"""
+        url = "https://www.youtube.com/@noetag/search?query=a"
+        response = mock_response(200, "<html>")
+        session = mock_session(response, response)
+        await _get_channel_html(session, "@noetag", url)
+        await _get_channel_html(session, "@noetag", url)
+        assert all(
+            "If-None-Match" not in call.kwargs["headers"]
+            for call in session.get.call_args_list
+        )
+
+    @pytest.mark.asyncio
+    async def test_error_releases_response(self):
+        """Test an error response is released before raising"""
+        url = "https://www.youtube.com/@missing/search?query=a"
+        response = mock_response(404)
+        with pytest.raises(HTTPException, match="@missing"):
+            await _get_channel_html(mock_session(response), "@missing", url)
+        response.__aexit__.assert_awaited_once()
+
+
+class TestYoutubeSearch:
+    """Test searching channels and merging their videos"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("channels", "expected"),
+        [
+            pytest.param("@searchone", ["searchone"], id="one_channel"),
+            pytest.param(
+                "@searchone,@searchtwo,@unknown",
+                ["searchone", "searchtwo"],
+                id="multiple_channels",
+            ),
+        ],
+    )
+    async def test_merges_channel_videos(
+        self, channels: str, expected: list[str], monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test each known channel is fetched once and its videos merged"""
+        index = {handle.lstrip("@"): handle for handle in ("@searchone", "@searchtwo")}
+        monkeypatch.setattr("api.youtube.get_youtube_index", lambda: index)
+        session = mock_session(
+            *[mock_response(200, channel_page(id_)) for id_ in expected]
+        )
+        result = await youtube_search(
+            channels,
+            "2024-02-05",
+            query=f"merge {channels}",
+            get_transcripts=False,
+            session=session,
+        )
+        assert sorted(video.id for video in result) == expected
+        assert session.get.call_count == len(expected)
+
+
+class TestYoutubeSearchStream:
+    """Test streaming channel results as they come in"""
+
+    @pytest.mark.asyncio
+    async def test_yields_fastest_channel_first_and_caches(
+        self, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test channels are yielded as they finish and fetched only once"""
+        index = {"slowstream": "@slowstream", "faststream": "@faststream"}
+        monkeypatch.setattr("api.youtube.get_youtube_index", lambda: index)
+
+        async def get_html(_session, channel, _url):
+            if channel == "@slowstream":
+                await asyncio.sleep(0.05)
+            return channel_page(channel.lstrip("@"))
+
+        fetch = AsyncMock(side_effect=get_html)
+        monkeypatch.setattr("api.youtube._get_channel_html", fetch)
+
+        async def search() -> list[list[str]]:
+            return [
+                [video.id for video in videos]
+                async for videos in youtube_search_stream(
+                    "@slowstream,@faststream",
+                    "2024-02-05",
+                    query="news",
+                    get_transcripts=False,
+                    session=MagicMock(),
+                )
+            ]
+
+        assert await search() == [["faststream"], ["slowstream"]]
+        assert sorted(await search()) == [["faststream"], ["slowstream"]]
+        assert fetch.call_count == 2
+
+
+class TestBuildYoutubeSearchUrl:
+    """Test the date filters in the Youtube search query"""
+
+    def test_dates_are_zero_padded(self):
+        """Test single digit months and days are zero padded"""
+        result = _build_youtube_search_url("news", 3, "2024-02-05")
+        assert result == "news+before%3A2024-02-05+after%3A2024-02-02"
@@ -1,8 +1,23 @@
 """Pytest configuration file for tests."""
 
 import sys
+from collections.abc import Iterator
+from datetime import datetime
 from pathlib import Path
 
+import pytest
+from freezegun import freeze_time
+
 # Add the project root directory to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+
+FROZEN_NOW = datetime(2024, 1, 15, 12, 0, 0)
+
+
+@pytest.fixture
+def frozen_now() -> Iterator[datetime]:
+    """Fixture that freezes the clock for the test and returns the frozen time"""
+    with freeze_time(FROZEN_NOW):
+        yield FROZEN_NOW
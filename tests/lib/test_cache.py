@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from lib.cache import async_threadsafe_ttl_cache
+
+
+class TestAsyncThreadsafeTtlCache:
+    """Tests for async_threadsafe_ttl_cache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_result(self) -> None:
+        """Test concurrent calls with the same key on one loop run the function once."""
+        calls = 0
+
+        @async_threadsafe_ttl_cache(ttl=60)
+        async def fetch(value: int) -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        results = await asyncio.wait_for(
+            asyncio.gather(fetch(1), fetch(1), fetch(2)), timeout=1
+        )
+
+        assert results == [2, 2, 4]
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_session_and_concurrency_not_in_key(self) -> None:
+        """Test calls only differing in session or concurrency share one result."""
+        calls = 0
+
+        @async_threadsafe_ttl_cache(ttl=60)
+        async def fetch(
+            value: int, session: object = None, concurrency: int = 10
+        ) -> int:
+            nonlocal calls
+            calls += 1
+            return value * 2
+
+        assert await fetch(1, session=object(), concurrency=5) == 2
+        assert await fetch(1, session=object(), concurrency=20) == 2
+        assert calls == 1
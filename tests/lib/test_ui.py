@@ -0,0 +1,36 @@
+import pytest
+
+from lib.ui import bool_param, int_param
+
+
+class TestQueryParams:
+    """Tests for the typed query param helpers."""
+
+    @pytest.mark.parametrize(
+        ("params", "expected"),
+        [
+            ({}, 3),
+            ({"n": "7"}, 7),
+            ({"n": "99"}, 10),
+            ({"n": "0"}, 1),
+            ({"n": "x"}, 3),
+        ],
+    )
+    def test_int_param(self, params: dict[str, str], expected: int) -> None:
+        """Test ints are parsed and clamped, falling back to the default."""
+        assert int_param(params, "n", 3, 1, 10) == expected
+
+    @pytest.mark.parametrize(
+        ("params", "expected"),
+        [
+            ({}, True),
+            ({"b": "false"}, False),
+            ({"b": "False"}, False),
+            ({"b": "0"}, False),
+            ({"b": "true"}, True),
+            ({"b": ""}, True),
+        ],
+    )
+    def test_bool_param(self, params: dict[str, str], expected: bool) -> None:
+        """Test "false"-like strings are false instead of truthy."""
+        assert bool_param(params, "b", True) is expected
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from lib.utils import bounded_gather
+
+
+class TestBoundedGather:
+    """Tests for bounded_gather."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_order_and_bounds_concurrency(self) -> None:
+        """Test that results keep their order and no more than `concurrency` run at once."""
+        running = 0
+        max_running = 0
+
+        async def work(value: int) -> int:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01 * (5 - value))
+            running -= 1
+            return value
+
+        results = await bounded_gather((work(i) for i in range(5)), concurrency=2)
+
+        assert results == [0, 1, 2, 3, 4]
+        assert max_running == 2